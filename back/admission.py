@@ -0,0 +1,144 @@
+# back/admission.py
+
+import asyncio
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Bulkhead:
+    """
+    Limits how many requests may run an expensive operation at the same time.
+
+    Up to `max_concurrency` callers run at once and up to `max_queue` more may
+    wait for a free slot. When the queue is full the request is shed right away
+    with a 429; when a queued request waits longer than `queue_timeout` seconds
+    it is shed with a 503. Both responses carry a `Retry-After` header.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int,
+                 queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters: deque = deque()
+
+    def _reject(self, status_code: int, reason: str):
+        print(f"Shedding '{self.name}' request: {reason}")
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"Server is busy, please retry later ({reason}).",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _release(self):
+        # Hand the slot straight to the next live waiter, otherwise free it
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    async def _acquire(self):
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject(429, "queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we gave up; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject(503, "queue timeout")
+            raise
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one concurrency slot for the duration of the `async with` block."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: while a call for a key is running,
+    later callers with the same key wait for it and share its result (or
+    exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        # Mark the exception as retrieved in case every caller has already gone
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+def normalize_text(text: str) -> str:
+    """Lower-cases a string and collapses whitespace so near-identical requests share a key."""
+    return " ".join(text.lower().split())
+
+
+def normalize_task_set(tasks: Iterable[str]) -> Tuple[str, ...]:
+    """Builds an order-independent key for a list of tasks."""
+    return tuple(sorted({normalize_text(task) for task in tasks}))
+
+
+# --- Per-endpoint limits (tunable from the environment) ---
+
+suggest_bulkhead = Bulkhead(
+    "suggest",
+    max_concurrency=int(os.getenv("SUGGEST_MAX_CONCURRENCY", 4)),
+    max_queue=int(os.getenv("SUGGEST_MAX_QUEUE", 16)),
+    queue_timeout=float(os.getenv("SUGGEST_QUEUE_TIMEOUT", 5.0)),
+    retry_after=int(os.getenv("SUGGEST_RETRY_AFTER", 5)),
+)
+
+search_bulkhead = Bulkhead(
+    "search",
+    max_concurrency=int(os.getenv("SEARCH_MAX_CONCURRENCY", 8)),
+    max_queue=int(os.getenv("SEARCH_MAX_QUEUE", 32)),
+    queue_timeout=float(os.getenv("SEARCH_QUEUE_TIMEOUT", 2.0)),
+    retry_after=int(os.getenv("SEARCH_RETRY_AFTER", 1)),
+)
+
+suggest_flights = SingleFlight()
+search_flights = SingleFlight()
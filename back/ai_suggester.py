@@ -29,7 +29,7 @@ class GraphState(TypedDict):
 
 
 # --- LangGraph Node ---
-def suggestion_node(state: GraphState):
+async def suggestion_node(state: GraphState):
     """
     Generates task suggestions based on the existing tasks.
     """
@@ -52,7 +52,15 @@ def suggestion_node(state: GraphState):
 
     # Initialize the Chat model
     # Using a current and recommended Gemini model
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", convert_system_message_to_human=True)
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        convert_system_message_to_human=True,
+        # Timeouts, retries and hedging are handled by `resilience.suggestion_caller`,
+        # so make a single request with no SDK retries. The async path only honours
+        # max_retries from langchain-google-genai 2.1.12 on; older releases always
+        # retry up to 6 times inside `_achat_with_retry`.
+        max_retries=1,
+    )
 
     # Create a chain that binds the structured output schema to the model
     structured_llm = llm.with_structured_output(SuggestedTasks)
@@ -64,7 +72,7 @@ def suggestion_node(state: GraphState):
     chain = prompt | structured_llm
 
     # Invoke the chain with the user's tasks
-    ai_response = chain.invoke({"tasks": task_list_str})
+    ai_response = await chain.ainvoke({"tasks": task_list_str})
 
     return {"suggestions": ai_response.tasks}
 
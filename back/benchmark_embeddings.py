@@ -0,0 +1,89 @@
+# back/benchmark_embeddings.py
+
+import argparse
+import statistics
+import sys
+import time
+from typing import List
+
+from embeddings import EMBEDDING_MODEL, ONNX_MODEL_DIR, OnnxEmbedder, TorchEmbedder, cosine_agreement
+
+SAMPLE_TEXTS = [
+    "Buy groceries",
+    "Book flights for the summer vacation",
+    "Reserve a hotel near the conference venue",
+    "Create a packing list",
+    "Call the dentist to reschedule the appointment",
+    "Finish the quarterly report and send it to the team",
+    "Renew car insurance before the end of the month",
+    "Water the plants",
+    "Fix the leaking kitchen tap",
+    "Prepare slides for Monday's product demo",
+    "Pay the electricity bill",
+    "Go for a 30 minute run",
+    "Read two chapters of the book club novel",
+    "Update the project README with setup instructions",
+    "Plan a birthday party for Sam",
+    "Clean out the garage",
+]
+
+
+def measure(embedder, texts: List[str], rounds: int) -> dict:
+    """Single-text latency percentiles (ms) and batched throughput (texts/s)."""
+    embedder.encode(texts)  # Warm up
+
+    latencies = []
+    for _ in range(rounds):
+        for text in texts:
+            started = time.perf_counter()
+            embedder.encode([text])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        embedder.encode(texts)
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "throughput": rounds * len(texts) / elapsed,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the PyTorch and int8 ONNX embedding engines for parity and speed."
+    )
+    parser.add_argument("--model", default=EMBEDDING_MODEL,
+                        help="sentence-transformers model name or local path.")
+    parser.add_argument("--onnx-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--min-cosine", type=float, default=0.98,
+                        help="Fail if any sample's cosine agreement is below this value.")
+    args = parser.parse_args()
+
+    torch_embedder = TorchEmbedder(args.model)
+    onnx_embedder = OnnxEmbedder(args.onnx_dir)
+
+    # --- Parity check ---
+    agreement = cosine_agreement(torch_embedder.encode(SAMPLE_TEXTS), onnx_embedder.encode(SAMPLE_TEXTS))
+    print(f"Dimensions: torch={torch_embedder.dimension}, onnx={onnx_embedder.dimension}")
+    print(f"Cosine agreement: mean={agreement.mean():.4f}, min={agreement.min():.4f}")
+
+    # --- Latency and throughput ---
+    print(f"{'engine':<8}{'p50 ms':>10}{'p95 ms':>10}{'texts/s':>12}")
+    for name, embedder in (("torch", torch_embedder), ("onnx", onnx_embedder)):
+        stats = measure(embedder, SAMPLE_TEXTS, args.rounds)
+        print(f"{name:<8}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['throughput']:>12.1f}")
+
+    if torch_embedder.dimension != onnx_embedder.dimension or agreement.min() < args.min_cosine:
+        print("Parity check FAILED")
+        return 1
+    print("Parity check passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,19 @@ def override_get_db():
     finally:
         db.close()
 
+@pytest.fixture
+def make_caller():
+    """Builds a HedgedCaller with no backoff or hedging so tests stay quick."""
+    from resilience import HedgedCaller
+
+    def _make_caller(**overrides):
+        settings = dict(deadline=1.0, attempt_timeout=1.0, max_attempts=3, backoff_base=0.0,
+                        backoff_max=0.0, hedge_percentile=0, hedge_min_samples=0)
+        settings.update(overrides)
+        return HedgedCaller("test", **settings)
+
+    return _make_caller
+
 @pytest.fixture(scope="function")
 def client(monkeypatch):
     # Mock reindex
@@ -0,0 +1,103 @@
+# back/embeddings.py
+
+import os
+from typing import List
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# "torch" runs SentenceTransformer via PyTorch, "onnx" runs the exported
+# int8-quantized model via onnxruntime (see export_onnx.py)
+EMBEDDING_ENGINE = os.getenv("EMBEDDING_ENGINE", "torch").lower()
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(os.path.dirname(__file__), "onnx_model"))
+ONNX_MODEL_FILE = "model.int8.onnx"
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", 0))  # 0 = onnxruntime default
+MAX_SEQ_LENGTH = 256  # Same as all-MiniLM-L6-v2's max_seq_length
+
+
+def mean_pool_normalize(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Averages token embeddings over the real (non-padding) tokens and L2
+    normalizes the result, matching SentenceTransformer's Pooling + Normalize.
+    """
+    mask = attention_mask[..., np.newaxis].astype(token_embeddings.dtype)
+    summed = (token_embeddings * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+    norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled / norms
+
+
+def cosine_agreement(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two (n, dim) embedding matrices."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+class TorchEmbedder:
+    """Embeds text with SentenceTransformer on PyTorch."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, convert_to_tensor=False)
+
+
+class OnnxEmbedder:
+    """
+    Embeds text with an int8-quantized ONNX export of the model on
+    onnxruntime's CPU provider. Output is the same 384-dim normalized vector
+    as TorchEmbedder, without importing PyTorch.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at '{model_path}'. Run `python export_onnx.py` first."
+            )
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_INTRA_OP_THREADS:
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feed = {name: value for name, value in inputs.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, feed)[0]
+        return mean_pool_normalize(token_embeddings, inputs["attention_mask"])
+
+
+def get_embedder(engine: str = EMBEDDING_ENGINE):
+    """Builds the embedding engine selected by configuration."""
+    if engine == "onnx":
+        return OnnxEmbedder()
+    if engine == "torch":
+        return TorchEmbedder()
+    raise ValueError(f"Unknown EMBEDDING_ENGINE '{engine}', expected 'torch' or 'onnx'.")
@@ -0,0 +1,75 @@
+# back/export_onnx.py
+
+import argparse
+import os
+
+from embeddings import EMBEDDING_MODEL, ONNX_MODEL_DIR, ONNX_MODEL_FILE
+
+
+def export_onnx_model(output_dir: str = ONNX_MODEL_DIR, model_name: str = EMBEDDING_MODEL):
+    """
+    Exports the transformer of the sentence-transformers model to ONNX,
+    quantizes its weights to int8 and saves the tokenizer next to it.
+    Needs PyTorch and the onnx package, so run it once at build time rather
+    than on the API hosts.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    print(f"--- Exporting '{model_name}' to ONNX in '{output_dir}' ---")
+    os.makedirs(output_dir, exist_ok=True)
+
+    sentence_model = SentenceTransformer(model_name, device="cpu")
+    transformer = sentence_model[0].auto_model.eval()
+    tokenizer = sentence_model.tokenizer
+
+    class TokenEmbeddings(torch.nn.Module):
+        """Returns only the last hidden state; pooling happens in OnnxEmbedder."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            )[0]
+
+    sample = tokenizer(["Export a sample sentence"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    fp32_path = os.path.join(output_dir, "model.onnx")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "token_embeddings": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+            dynamo=False,
+        )
+    print(f"Exported fp32 model to {fp32_path}")
+
+    int8_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Quantized int8 model to {int8_path}")
+
+    tokenizer.save_pretrained(output_dir)
+    print("--- ONNX export complete! ---")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export an int8-quantized ONNX embedding model.")
+    parser.add_argument("--model", default=EMBEDDING_MODEL,
+                        help="sentence-transformers model name or local path.")
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+    export_onnx_model(output_dir=args.output_dir, model_name=args.model)
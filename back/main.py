@@ -1,3 +1,6 @@
+import asyncio
+import os
+import time
 from contextlib import asynccontextmanager
 
 from sqlalchemy.orm import Session
@@ -8,10 +11,17 @@ from database import SessionLocal, engine
 from fastapi.middleware.cors import CORSMiddleware
 from ai_suggester import get_suggestions_graph
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
 from reindex import reindex_all_todos
+from admission import (
+    suggest_bulkhead, search_bulkhead, suggest_flights, search_flights,
+    normalize_text, normalize_task_set,
+)
+from resilience import suggestion_caller
+import profiling
 
 # <<< 1. Import the new vector DB client
-from vector_db import vector_db_client
+from vector_db import vector_db_client, MIN_SCORE_THRESHOLD
 
 # Create all database tables
 models.Base.metadata.create_all(bind=engine)
@@ -50,6 +60,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; nothing is registered unless PROFILING_TOKEN is set
+if profiling.PROFILING_TOKEN:
+    app.add_middleware(profiling.ProfilingMiddleware)
+    app.include_router(profiling.router)
+
 
 def get_db():
     db = SessionLocal()
@@ -64,29 +79,51 @@ def read_root():
     return {"message": "Welcome to the To-Do App API"}
 
 
-# --- AI Suggestions Endpoint (No Changes Needed) ---
+# --- AI Suggestions Endpoint ---
+# Upper bound for the local fallback once the AI deadline has been hit
+FALLBACK_TIMEOUT = float(os.getenv("SUGGEST_FALLBACK_TIMEOUT", 1.0))
+
+
+async def _generate_suggestions(tasks: List[str]) -> dict:
+    # The deadline starts when the request arrives, so queueing time counts against it
+    arrived = time.monotonic()
+    async with suggest_bulkhead.slot():
+        try:
+            graph = get_suggestions_graph()
+            # Deadline, retries with backoff and hedged requests
+            result = await suggestion_caller.call(
+                lambda: graph.ainvoke({"existing_tasks": tasks}),
+                deadline=suggestion_caller.deadline - (time.monotonic() - arrived),
+            )
+            return {"suggestions": result['suggestions'], "degraded": False}
+        except Exception as e:
+            print(f"Error during AI suggestion, using local fallback: {e!r}")
+
+        # Degraded answer: related tasks from the vector collection
+        try:
+            fallback = await asyncio.wait_for(
+                run_in_threadpool(vector_db_client.suggest_related, tasks),
+                timeout=FALLBACK_TIMEOUT,
+            )
+            return {"suggestions": fallback, "degraded": True}
+        except Exception as e:
+            print(f"Error during fallback suggestion: {e!r}")
+            raise HTTPException(status_code=500, detail="Failed to generate AI suggestions.")
+
+
 @app.post("/todos/suggest", response_model=schemas.SuggestionResponse)
 async def suggest_todos(request: schemas.SuggestionRequest):
-    try:
-        graph = get_suggestions_graph()
-        result = await graph.ainvoke({"existing_tasks": request.tasks})
-        return {"suggestions": result['suggestions']}
-    except Exception as e:
-        print(f"Error during AI suggestion: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate AI suggestions.")
+    # Identical task sets share a single LLM call
+    return await suggest_flights.do(
+        normalize_task_set(request.tasks),
+        lambda: _generate_suggestions(request.tasks),
+    )
 
 
 # <<< 2. Add the new Vector Search Endpoint
-@app.post("/todos/search", response_model=schemas.SearchResponse)
-def search_for_todos(request: schemas.SearchRequest):
-    """
-    Searches for semantically similar to-do items using vector search.
-    """
+def _run_vector_search(query: str) -> List[schemas.SearchResult]:
     try:
-        # Define a minimum confidence score
-        MIN_SCORE_THRESHOLD = 0.30  # <<< You can tune this value
-
-        search_results = vector_db_client.search_todos(query=request.query)
+        search_results = vector_db_client.search_todos(query=query)
 
         # <<< Filter the results based on the threshold
         filtered_results = [
@@ -94,7 +131,7 @@ def search_for_todos(request: schemas.SearchRequest):
         ]
 
         # Format the (now filtered) results to match the Pydantic response model
-        formatted_results = [
+        return [
             schemas.SearchResult(
                 id=result.id,
                 text=result.payload.get('text', ''),
@@ -102,12 +139,30 @@ def search_for_todos(request: schemas.SearchRequest):
             )
             for result in filtered_results
         ]
-        return {"results": formatted_results}
     except Exception as e:
         print(f"Error during vector search: {e}")
         raise HTTPException(status_code=500, detail="Failed to perform vector search.")
 
 
+async def _search_with_limits(query: str) -> List[schemas.SearchResult]:
+    async with search_bulkhead.slot():
+        # Embedding + ANN search is blocking, keep it off the event loop
+        return await run_in_threadpool(_run_vector_search, query)
+
+
+@app.post("/todos/search", response_model=schemas.SearchResponse)
+async def search_for_todos(request: schemas.SearchRequest):
+    """
+    Searches for semantically similar to-do items using vector search.
+    """
+    # Identical (normalized) queries share a single embedding + search
+    results = await search_flights.do(
+        normalize_text(request.query),
+        lambda: _search_with_limits(request.query),
+    )
+    return {"results": results}
+
+
 # --- Standard Todo Endpoints (with vector DB integration) ---
 
 @app.post("/todos/", response_model=schemas.Todo)
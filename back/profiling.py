@@ -0,0 +1,273 @@
+# back/profiling.py
+
+import asyncio
+import contextvars
+import hmac
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Profiling is switched off (no middleware, no debug routes) unless a token is set
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "todo-profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 100))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+MAX_PROFILE_SECONDS = 60
+
+# Set while a request is being profiled; copied into every task the request
+# spawns and into the worker threads that run its sync endpoint and dependencies
+_active_profile: contextvars.ContextVar = contextvars.ContextVar("active_profile", default=None)
+
+# (file, function) of a blocking call made by a pool's own loop while it
+# waits for the next job, mapped to the function name of that loop
+IDLE_WAITS = {
+    ("queue.py", "get"): {"run"},                # anyio worker threads
+    ("selectors.py", "select"): {"_run_once"},   # asyncio event loop
+}
+# Loops that wait in C code, so they are the leaf frame while idle
+IDLE_LEAVES = {
+    ("thread.py", "_worker"),                    # concurrent.futures workers (SimpleQueue.get)
+}
+
+
+def _code_key(frame):
+    return os.path.basename(frame.f_code.co_filename), frame.f_code.co_name
+
+
+def _is_idle(frames: List) -> bool:
+    """True when a thread is a pool worker or event loop waiting for work (frames are leaf first)."""
+    if frames and _code_key(frames[0]) in IDLE_LEAVES:
+        return True
+    for frame, caller in zip(frames, frames[1:]):
+        waiting_in = IDLE_WAITS.get(_code_key(frame))
+        if waiting_in and caller.f_code.co_name in waiting_in:
+            return True
+    return False
+
+
+def _thread_context(frames: List) -> Optional[contextvars.Context]:
+    """Finds the contextvars.Context a worker thread is running its current job in."""
+    for frame in reversed(frames[-4:]):
+        for value in frame.f_locals.values():
+            if isinstance(value, contextvars.Context):
+                return value
+    return None
+
+
+def _loop_context(loop, frames: List) -> Optional[contextvars.Context]:
+    """Finds the contextvars.Context the event loop is running its current callback in."""
+    task = asyncio.current_task(loop)
+    if task is not None and hasattr(task, "get_context"):  # Python 3.12+
+        return task.get_context()
+    # Python 3.11: the C Task does not expose its context, but the Handle the
+    # loop is running (events.py `Handle._run`) holds it
+    for frame in frames:
+        if _code_key(frame) == ("events.py", "_run"):
+            handle = frame.f_locals.get("self")
+            return getattr(handle, "_context", None)
+    return None
+
+
+class StackSampler:
+    """
+    Samples Python stacks at a fixed interval from a background thread and
+    aggregates them as collapsed stacks, the format understood by speedscope
+    and flamegraph.pl. `include(thread_id, frames)` picks which threads are
+    recorded; by default every thread that is not an idle pool worker.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL,
+                 include: Optional[Callable[[int, List], bool]] = None):
+        self.interval = interval
+        self.include = include or (lambda thread_id, frames: not _is_idle(frames))
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            if not self.include(thread_id, frames):
+                continue
+            stack = [names.get(thread_id, str(thread_id))]
+            stack.extend(
+                f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)}:{f.f_code.co_firstlineno})"
+                for f in reversed(frames)
+            )
+            self.counts[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.counts.most_common()) + "\n"
+
+
+def request_sampler(marker: object) -> StackSampler:
+    """
+    Builds a sampler that only records the threads working on one request:
+    the event loop while it runs the request's task or a task it spawned, and
+    worker threads whose current job was started from that request.
+    """
+    loop = asyncio.get_running_loop()
+    loop_thread_id = threading.get_ident()
+
+    def include(thread_id: int, frames: List) -> bool:
+        if _is_idle(frames):
+            return False
+        if thread_id == loop_thread_id:
+            context = _loop_context(loop, frames)
+        else:
+            context = _thread_context(frames)
+        return context is not None and context.get(_active_profile) is marker
+
+    return StackSampler(include=include)
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+def new_profile_id(label: str) -> str:
+    safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_")
+    return f"{int(time.time() * 1000)}-{safe_label}-{uuid.uuid4().hex[:8]}.collapsed"
+
+
+def save_profile(sampler: StackSampler, profile_id: str):
+    """
+    Stops the sampler and writes its collapsed stacks to PROFILE_DIR, keeping
+    only the newest PROFILE_MAX_FILES profiles. Blocking; run it in the threadpool.
+    """
+    sampler.stop()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, profile_id), "w") as f:
+        f.write(sampler.collapsed())
+
+    stored = sorted(
+        (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".collapsed")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in stored[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request when it carries `X-Profile: 1` (or `?profile=1`)
+    together with a valid `X-Admin-Token`. Other requests are passed straight
+    through. The profile id is returned in the `X-Profile-Id` response header
+    and the profile is stored in PROFILE_DIR once the response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(f"{scope['method']}-{scope['path']}")
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        marker = object()
+        token = _active_profile.set(marker)
+        sampler = request_sampler(marker)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _active_profile.reset(token)
+            await run_in_threadpool(save_profile, sampler, profile_id)
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        flagged = False
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile" and value == b"1":
+                flagged = True
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if not flagged and b"profile" in scope["query_string"]:
+            flagged = parse_qs(scope["query_string"].decode("latin-1")).get("profile") == ["1"]
+        return flagged and is_authorized(token)
+
+
+# --- Debug Endpoints ---
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def _require_admin(token: Optional[str]):
+    if not is_authorized(token):
+        # Pretend the route does not exist to unauthenticated callers
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_process(seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS),
+                          x_admin_token: Optional[str] = Header(None)):
+    """
+    Samples the whole process for `seconds` and returns collapsed stacks.
+    """
+    _require_admin(x_admin_token)
+    sampler = StackSampler()
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await run_in_threadpool(sampler.stop)
+    return sampler.collapsed()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Downloads a profile stored by a profiled request.
+    """
+    _require_admin(x_admin_token)
+    path = os.path.join(PROFILE_DIR, os.path.basename(profile_id))
+    if not profile_id.endswith(".collapsed") or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=profile_id)
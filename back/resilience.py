@@ -0,0 +1,130 @@
+# back/resilience.py
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class LatencyTracker:
+    """Keeps a rolling window of successful call latencies (in seconds)."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgedCaller:
+    """
+    Runs an async upstream call under a hard deadline.
+
+    Each attempt is cut off after `attempt_timeout` seconds. Failed or timed
+    out attempts are retried with exponential backoff (full jitter) while
+    time remains. Once enough latency samples exist, an attempt that is slower
+    than the `hedge_percentile` latency gets a second, hedged request and the
+    first successful response wins. When the deadline passes everything still
+    running is cancelled and `asyncio.TimeoutError` is raised.
+    """
+
+    def __init__(self, name: str, deadline: float, attempt_timeout: float, max_attempts: int,
+                 backoff_base: float, backoff_max: float,
+                 hedge_percentile: float, hedge_min_samples: int):
+        self.name = name
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyTracker()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> Any:
+        """
+        Runs `fn` with retries and hedging. `deadline` overrides the configured
+        deadline, e.g. with the time left after waiting in a queue.
+        """
+        timeout = self.deadline if deadline is None else deadline
+        if timeout <= 0:
+            raise asyncio.TimeoutError(f"'{self.name}' deadline already passed")
+        return await asyncio.wait_for(self._call_with_retries(fn), timeout=timeout)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile <= 0 or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.hedge_percentile)
+
+    async def _call_with_retries(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_attempts):
+            try:
+                return await self._hedged(fn)
+            except Exception as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                print(f"'{self.name}' attempt {attempt + 1} failed ({e!r}); retrying in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+
+    async def _timed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        result = await asyncio.wait_for(fn(), timeout=self.attempt_timeout)
+        self.latencies.record(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        pending = {asyncio.ensure_future(self._timed(fn))}
+        started = list(pending)
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    print(f"'{self.name}' slower than p{self.hedge_percentile:g} ({delay:.2f}s); sending hedged request")
+                    hedge = asyncio.ensure_future(self._timed(fn))
+                    started.append(hedge)
+                    pending.add(hedge)
+                else:
+                    pending = done
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in started:
+                task.cancel()
+
+
+suggestion_caller = HedgedCaller(
+    "suggest",
+    deadline=float(os.getenv("SUGGEST_DEADLINE", 8.0)),
+    attempt_timeout=float(os.getenv("SUGGEST_ATTEMPT_TIMEOUT", 3.0)),
+    max_attempts=int(os.getenv("SUGGEST_MAX_ATTEMPTS", 3)),
+    backoff_base=float(os.getenv("SUGGEST_BACKOFF_BASE", 0.25)),
+    backoff_max=float(os.getenv("SUGGEST_BACKOFF_MAX", 2.0)),
+    # Set to 0 to disable hedged requests
+    hedge_percentile=float(os.getenv("SUGGEST_HEDGE_PERCENTILE", 95)),
+    hedge_min_samples=int(os.getenv("SUGGEST_HEDGE_MIN_SAMPLES", 20)),
+)
@@ -27,6 +27,7 @@ class SuggestionRequest(BaseModel):
 
 class SuggestionResponse(BaseModel):
     suggestions: List[str]
+    degraded: bool = False  # True when served by the local nearest-neighbour fallback
 
 class SearchRequest(BaseModel):
     query: str
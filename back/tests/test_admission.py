@@ -0,0 +1,146 @@
+# back/tests/test_admission.py
+
+import asyncio
+import gc
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from admission import Bulkhead, SingleFlight, normalize_text, normalize_task_set
+
+
+def test_bulkhead_sheds_with_429_when_queue_full():
+    """
+    Test that requests beyond concurrency + queue capacity are rejected immediately.
+    """
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=1, queue_timeout=1.0, retry_after=3)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with bulkhead.slot():
+                await release.wait()
+
+        running = asyncio.ensure_future(hold())
+        queued = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            async with bulkhead.slot():
+                pass
+
+        release.set()
+        await asyncio.gather(running, queued)
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "3"
+    assert bulkhead.active == 0
+
+
+def test_bulkhead_sheds_with_503_on_queue_timeout():
+    """
+    Test that a queued request gives up with a 503 once its queue timeout passes.
+    """
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=4, queue_timeout=0.01, retry_after=1)
+
+    async def scenario():
+        async with bulkhead.slot():
+            with pytest.raises(HTTPException) as exc_info:
+                async with bulkhead.slot():
+                    pass
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert bulkhead.active == 0
+
+
+def test_single_flight_coalesces_identical_calls():
+    """
+    Test that concurrent calls with the same key share one underlying call.
+    """
+    flights = SingleFlight()
+    calls = []
+
+    async def expensive():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["shared"]
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("key", expensive) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == ["shared"] for result in results)
+    assert len(flights) == 0
+
+
+def test_normalization_keys():
+    """
+    Test that near-identical queries and reordered task sets map to the same key.
+    """
+    assert normalize_text("  Buy   Groceries ") == normalize_text("buy groceries")
+    assert normalize_task_set(["B", "a"]) == normalize_task_set(["A", "b", "a"])
+
+
+def test_search_returns_429_when_overloaded(client):
+    """
+    Test that the search endpoint surfaces load shedding as a 429 with Retry-After.
+    """
+    full = Bulkhead("search", max_concurrency=0, max_queue=0, queue_timeout=1.0, retry_after=2)
+
+    with patch('main.search_bulkhead', full), patch('main.vector_db_client'):
+        response = client.post("/todos/search", json={"query": "shopping"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+@patch('main.get_suggestions_graph')
+def test_suggest_returns_429_when_overloaded(mock_get_graph, client):
+    """
+    Test that the suggestion endpoint sheds load without calling the LLM.
+    """
+    mock_graph_instance = MagicMock()
+    mock_graph_instance.ainvoke = AsyncMock(return_value={"suggestions": []})
+    mock_get_graph.return_value = mock_graph_instance
+    full = Bulkhead("suggest", max_concurrency=0, max_queue=0, queue_timeout=1.0, retry_after=5)
+
+    with patch('main.suggest_bulkhead', full):
+        response = client.post("/todos/suggest", json={"tasks": ["Plan my next project"]})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+    mock_graph_instance.ainvoke.assert_not_called()
+
+
+def test_single_flight_failure_without_waiters_is_retrieved():
+    """
+    Test that a shared call failing after every caller has left does not log
+    "Task exception was never retrieved".
+    """
+    flights = SingleFlight()
+    unhandled = []
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream error")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _, context: unhandled.append(context))
+        caller = asyncio.ensure_future(flights.do("key", failing))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    gc.collect()
+    assert unhandled == []
+    assert len(flights) == 0
@@ -0,0 +1,33 @@
+# back/tests/test_ai_suggester.py
+
+import asyncio
+import time
+from unittest.mock import patch, MagicMock, AsyncMock, PropertyMock
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from ai_suggester import suggestion_node
+
+
+def test_fast_upstream_error_reaches_caller_retry_loop(monkeypatch, make_caller):
+    """
+    Test that a fast Gemini error is not retried inside the SDK, so each
+    HedgedCaller attempt makes exactly one upstream call and fails immediately.
+    """
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    fake_client = MagicMock()
+    fake_client.generate_content = AsyncMock(side_effect=ServiceUnavailable("Gemini overloaded"))
+    caller = make_caller(deadline=5.0, attempt_timeout=5.0, max_attempts=2)
+
+    with patch.object(ChatGoogleGenerativeAI, "async_client", new_callable=PropertyMock,
+                      return_value=fake_client):
+        started = time.perf_counter()
+        with pytest.raises(Exception) as exc_info:
+            asyncio.run(caller.call(lambda: suggestion_node({"existing_tasks": ["Plan vacation"]})))
+        elapsed = time.perf_counter() - started
+
+    assert not isinstance(exc_info.value, asyncio.TimeoutError)
+    assert fake_client.generate_content.await_count == 2
+    assert elapsed < 1.0
@@ -0,0 +1,72 @@
+# back/tests/test_embeddings.py
+
+import os
+
+import numpy as np
+import pytest
+
+import embeddings
+from embeddings import cosine_agreement, get_embedder, mean_pool_normalize
+
+
+def test_mean_pool_ignores_padding_and_normalizes():
+    """
+    Test that padding tokens do not affect the pooled, unit-length embedding.
+    """
+    token_embeddings = np.array([
+        [[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]],  # Last token is padding
+        [[0.0, 2.0], [0.0, 4.0], [0.0, 6.0]],
+    ])
+    attention_mask = np.array([[1, 1, 0], [1, 1, 1]])
+
+    pooled = mean_pool_normalize(token_embeddings, attention_mask)
+
+    np.testing.assert_allclose(pooled, [[1.0, 0.0], [0.0, 1.0]])
+    np.testing.assert_allclose(np.linalg.norm(pooled, axis=1), 1.0)
+
+
+def test_cosine_agreement():
+    """
+    Test row-wise cosine similarity used by the parity check.
+    """
+    a = np.array([[1.0, 0.0], [1.0, 1.0]])
+    b = np.array([[2.0, 0.0], [1.0, -1.0]])
+
+    np.testing.assert_allclose(cosine_agreement(a, b), [1.0, 0.0], atol=1e-9)
+
+
+def test_unknown_engine_is_rejected():
+    """
+    Test that a misconfigured EMBEDDING_ENGINE fails loudly.
+    """
+    with pytest.raises(ValueError):
+        get_embedder("tensorflow")
+
+
+def test_onnx_engine_requires_exported_model(tmp_path):
+    """
+    Test that the ONNX engine points to the export script when the model is missing.
+    """
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+
+    with pytest.raises(FileNotFoundError, match="export_onnx.py"):
+        embeddings.OnnxEmbedder(model_dir=str(tmp_path))
+
+
+@pytest.mark.skipif(
+    not os.path.isfile(os.path.join(embeddings.ONNX_MODEL_DIR, embeddings.ONNX_MODEL_FILE)),
+    reason="ONNX model has not been exported (python export_onnx.py)",
+)
+def test_onnx_engine_matches_torch_engine():
+    """
+    Test that the int8 ONNX engine agrees with the PyTorch engine on a sample set.
+    """
+    from benchmark_embeddings import SAMPLE_TEXTS
+
+    torch_vectors = embeddings.TorchEmbedder().encode(SAMPLE_TEXTS)
+    onnx_vectors = embeddings.OnnxEmbedder().encode(SAMPLE_TEXTS)
+
+    assert onnx_vectors.shape == (len(SAMPLE_TEXTS), 384)
+    np.testing.assert_allclose(np.linalg.norm(onnx_vectors, axis=1), 1.0, atol=1e-5)
+    assert cosine_agreement(torch_vectors, onnx_vectors).min() >= 0.98
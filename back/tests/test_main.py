@@ -1,5 +1,6 @@
 # back/tests/test_main.py
 
+import asyncio
 from unittest.mock import patch, MagicMock, AsyncMock
 
 
@@ -137,23 +138,75 @@ def test_suggest_todos_mocked(mock_get_graph, client):
 
     assert response.status_code == 200
     assert response.json() == {
-        "suggestions": ["Mocked Suggestion 1", "Mocked Suggestion 2"]
+        "suggestions": ["Mocked Suggestion 1", "Mocked Suggestion 2"],
+        "degraded": False
     }
 
 
 @patch('main.get_suggestions_graph')
-def test_suggest_todos_error_handling(mock_get_graph, client):
+def test_suggest_todos_error_handling(mock_get_graph, client, make_caller):
     """
-    Tests error handling in the AI suggestion endpoint.
+    Tests error handling in the AI suggestion endpoint when the fallback fails too.
     """
     mock_graph_instance = MagicMock()
     mock_graph_instance.ainvoke = AsyncMock(side_effect=Exception("AI service unavailable"))
     mock_get_graph.return_value = mock_graph_instance
 
-    response = client.post(
-        "/todos/suggest",
-        json={"tasks": ["Plan my next project"]}
-    )
+    with patch('main.suggestion_caller', make_caller(max_attempts=2)), patch('main.vector_db_client') as mock_vector_db:
+        mock_vector_db.suggest_related.side_effect = Exception("Vector DB unavailable")
+
+        response = client.post(
+            "/todos/suggest",
+            json={"tasks": ["Plan my next project"]}
+        )
 
     assert response.status_code == 500
-    assert "Failed to generate AI suggestions" in response.json()["detail"]
\ No newline at end of file
+    assert "Failed to generate AI suggestions" in response.json()["detail"]
+
+
+@patch('main.get_suggestions_graph')
+def test_suggest_todos_falls_back_on_error(mock_get_graph, client, make_caller):
+    """
+    Tests that an upstream failure returns degraded nearest-neighbour suggestions.
+    """
+    mock_graph_instance = MagicMock()
+    mock_graph_instance.ainvoke = AsyncMock(side_effect=Exception("AI service unavailable"))
+    mock_get_graph.return_value = mock_graph_instance
+
+    with patch('main.suggestion_caller', make_caller(max_attempts=2)), patch('main.vector_db_client') as mock_vector_db:
+        mock_vector_db.suggest_related.return_value = ["Book flights"]
+
+        response = client.post(
+            "/todos/suggest",
+            json={"tasks": ["Plan vacation"]}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"suggestions": ["Book flights"], "degraded": True}
+    assert mock_graph_instance.ainvoke.await_count == 2  # Retried before falling back
+    mock_vector_db.suggest_related.assert_called_once_with(["Plan vacation"])
+
+
+@patch('main.get_suggestions_graph')
+def test_suggest_todos_falls_back_on_deadline(mock_get_graph, client, make_caller):
+    """
+    Tests that a slow upstream is cut off at the deadline and the fallback is returned.
+    """
+    async def slow_ainvoke(state):
+        await asyncio.sleep(5)
+        return {"suggestions": ["Too late"]}
+
+    mock_graph_instance = MagicMock()
+    mock_graph_instance.ainvoke = slow_ainvoke
+    mock_get_graph.return_value = mock_graph_instance
+
+    with patch('main.suggestion_caller', make_caller(deadline=0.05)), patch('main.vector_db_client') as mock_vector_db:
+        mock_vector_db.suggest_related.return_value = ["Reserve hotel"]
+
+        response = client.post(
+            "/todos/suggest",
+            json={"tasks": ["Plan vacation"]}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"suggestions": ["Reserve hotel"], "degraded": True}
@@ -0,0 +1,181 @@
+# back/tests/test_profiling.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import profiling
+from admission import SingleFlight
+
+TOKEN = "secret-token"
+
+
+@pytest.fixture
+def profiled_client(tmp_path):
+    """A small app with the profiling middleware and debug routes enabled."""
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+    app.include_router(profiling.router)
+
+    @app.get("/busy")
+    def busy():
+        return {"total": sum(i * i for i in range(200_000))}
+
+    flights = SingleFlight()
+
+    async def coalesced_busy_work():
+        return sum(i * i for i in range(2_000_000))
+
+    @app.get("/coalesced")
+    async def coalesced():
+        return {"total": await flights.do("key", coalesced_busy_work)}
+
+    with patch.object(profiling, "PROFILING_TOKEN", TOKEN), \
+            patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+        with TestClient(app) as test_client:
+            yield test_client
+
+
+def test_profiling_disabled_by_default(client):
+    """
+    Test that the debug routes are not registered without a token.
+    """
+    response = client.get("/debug/profile?seconds=1")
+    assert response.status_code == 404
+
+
+def unrelated_spin(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def blocked_on_lock(lock):
+    with lock:
+        pass
+
+
+@pytest.fixture
+def background_threads():
+    """
+    A busy thread, a thread blocked on a lock and an idle pool worker, none of
+    them part of any request.
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    lock.acquire()
+    threads = [
+        threading.Thread(target=unrelated_spin, args=(stop,), daemon=True),
+        threading.Thread(target=blocked_on_lock, args=(lock,), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(lambda: None).result()
+    yield
+    executor.shutdown()
+    stop.set()
+    lock.release()
+    for thread in threads:
+        thread.join()
+
+
+def test_sampler_collects_collapsed_stacks():
+    """
+    Test that the sampler records stacks in collapsed format.
+    """
+    sampler = profiling.StackSampler(interval=0.001)
+    sampler.start()
+    sum(i * i for i in range(2_000_000))
+    sampler.stop()
+
+    output = sampler.collapsed()
+    assert "test_sampler_collects_collapsed_stacks" in output
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in output.strip().splitlines())
+
+
+def test_request_profile_is_stored(profiled_client):
+    """
+    Test that a request with the profile header and token stores a profile.
+    """
+    response = profiled_client.get("/busy", headers={"X-Profile": "1", "X-Admin-Token": TOKEN})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert os.path.isfile(os.path.join(profiling.PROFILE_DIR, profile_id))
+
+    download = profiled_client.get(f"/debug/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN})
+    assert download.status_code == 200
+    assert "busy" in download.text
+
+
+def test_request_profile_only_samples_its_own_threads(profiled_client, background_threads):
+    """
+    Test that a request profile leaves out threads that are not working on it.
+    """
+    response = profiled_client.get("/busy", headers={"X-Profile": "1", "X-Admin-Token": TOKEN})
+    profile = open(os.path.join(profiling.PROFILE_DIR, response.headers["X-Profile-Id"])).read()
+
+    assert "busy" in profile
+    assert "unrelated_spin" not in profile
+    assert "blocked_on_lock" not in profile
+
+
+def test_request_profile_includes_tasks_spawned_by_the_request(profiled_client, background_threads):
+    """
+    Test that loop-side work running in a task the request spawned (here via
+    SingleFlight.do) is part of the request's profile.
+    """
+    response = profiled_client.get("/coalesced", headers={"X-Profile": "1", "X-Admin-Token": TOKEN})
+    profile = open(os.path.join(profiling.PROFILE_DIR, response.headers["X-Profile-Id"])).read()
+
+    assert "coalesced_busy_work" in profile
+    assert "unrelated_spin" not in profile
+
+
+def test_process_profile_keeps_threads_blocked_on_locks(profiled_client, background_threads):
+    """
+    Test that whole-process sampling drops idle pool workers but not a thread waiting on a lock.
+    """
+    response = profiled_client.get("/debug/profile?seconds=0.2", headers={"X-Admin-Token": TOKEN})
+
+    assert "unrelated_spin" in response.text
+    assert "blocked_on_lock" in response.text
+    assert "_worker (thread.py" not in response.text
+
+
+def test_stored_profiles_are_unique_and_capped(profiled_client):
+    """
+    Test that profile ids do not collide and old profiles are pruned.
+    """
+    with patch.object(profiling, "PROFILE_MAX_FILES", 2):
+        ids = [
+            profiled_client.get("/busy?profile=1", headers={"X-Admin-Token": TOKEN}).headers["X-Profile-Id"]
+            for _ in range(3)
+        ]
+
+    assert len(set(ids)) == 3
+    assert len(os.listdir(profiling.PROFILE_DIR)) == 2
+
+
+def test_request_not_profiled_without_token(profiled_client):
+    """
+    Test that the profile flag is ignored without a valid admin token.
+    """
+    response = profiled_client.get("/busy?profile=1", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_process_profile_endpoint(profiled_client):
+    """
+    Test whole-process sampling and its admin check.
+    """
+    assert profiled_client.get("/debug/profile?seconds=0.1").status_code == 404
+
+    response = profiled_client.get("/debug/profile?seconds=0.1", headers={"X-Admin-Token": TOKEN})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
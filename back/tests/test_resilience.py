@@ -0,0 +1,113 @@
+# back/tests/test_resilience.py
+
+import asyncio
+
+import pytest
+
+from resilience import LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    """
+    Test that the tracker reports percentiles over its samples.
+    """
+    tracker = LatencyTracker()
+    assert tracker.percentile(95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(50) == pytest.approx(0.05, abs=0.001)
+    assert tracker.percentile(95) == pytest.approx(0.095, abs=0.001)
+
+
+def test_retries_until_success(make_caller):
+    """
+    Test that failed attempts are retried within the attempt budget.
+    """
+    caller = make_caller()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("upstream error")
+        return "ok"
+
+    assert asyncio.run(caller.call(flaky)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_raises_after_last_attempt(make_caller):
+    """
+    Test that the last error is raised once all attempts are used.
+    """
+    caller = make_caller(max_attempts=2)
+
+    async def broken():
+        raise RuntimeError("upstream error")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(caller.call(broken))
+
+
+def test_deadline_bounds_latency(make_caller):
+    """
+    Test that a slow call is cancelled once the deadline passes.
+    """
+    caller = make_caller(deadline=0.05)
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(caller.call(slow))
+
+
+def test_hedged_request_wins_over_slow_primary(make_caller):
+    """
+    Test that a call slower than the hedge percentile gets a second request,
+    and the fastest response is used.
+    """
+    caller = make_caller(hedge_percentile=95, hedge_min_samples=1)
+    caller.latencies.record(0.01)
+    delays = [5, 0]
+
+    async def sometimes_slow():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return f"slept {delay}"
+
+    assert asyncio.run(caller.call(sometimes_slow)) == "slept 0"
+    assert delays == []
+
+
+def test_hung_attempt_is_retried_before_deadline(make_caller):
+    """
+    Test that an attempt hanging past its timeout is abandoned and retried
+    while the overall deadline still has time left.
+    """
+    caller = make_caller(deadline=1.0, attempt_timeout=0.05)
+    attempts = []
+
+    async def hangs_first():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(5)
+        return "ok"
+
+    assert asyncio.run(caller.call(hangs_first)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_deadline_override_already_spent(make_caller):
+    """
+    Test that a deadline used up while queueing fails without calling upstream.
+    """
+    caller = make_caller()
+    attempts = []
+
+    async def upstream():
+        attempts.append(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(caller.call(upstream, deadline=0))
+    assert attempts == []
@@ -0,0 +1,42 @@
+# back/tests/test_vector_db.py
+
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+import vector_db
+from vector_db import VectorDB
+
+
+def make_point(text, score):
+    point = MagicMock()
+    point.payload = {"text": text}
+    point.score = score
+    return point
+
+
+def test_suggest_related_batches_recent_tasks():
+    """
+    Test that the suggestion fallback embeds and searches a bounded number of
+    tasks in one batch, and drops the user's own tasks even when case or
+    whitespace differ.
+    """
+    db = VectorDB()
+    db.embedding_model = MagicMock()
+    db.embedding_model.encode.side_effect = lambda texts: np.ones((len(texts), 384))
+    db.client = MagicMock()
+    db.client.query_batch_points.return_value = [
+        MagicMock(points=[make_point("Book flights", 0.7), make_point("task   6", 0.9)]),
+        MagicMock(points=[make_point("Reserve hotel", 0.8), make_point("Book flights", 0.5)]),
+    ]
+    tasks = [f"Task {i}" for i in range(1, 8)]
+
+    with patch.object(vector_db, "TESTING", False):
+        suggestions = db.suggest_related(tasks)
+
+    db.embedding_model.encode.assert_called_once_with(tasks[-vector_db.FALLBACK_MAX_TASKS:])
+    db.client.query_batch_points.assert_called_once()
+    requests = db.client.query_batch_points.call_args.kwargs["requests"]
+    assert len(requests) == vector_db.FALLBACK_MAX_TASKS
+    assert all(request.score_threshold == vector_db.MIN_SCORE_THRESHOLD for request in requests)
+    assert suggestions == ["Reserve hotel", "Book flights"]
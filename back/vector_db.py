@@ -3,15 +3,21 @@ import os
 from unittest.mock import MagicMock
 
 from qdrant_client import QdrantClient, models
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
+from embeddings import get_embedder
+from admission import normalize_text
+
 load_dotenv()
 
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
 COLLECTION_NAME = "todos"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Minimum similarity for a stored to-do to count as a match
+MIN_SCORE_THRESHOLD = 0.30  # <<< You can tune this value
+# How many of the user's tasks the suggestion fallback looks at
+FALLBACK_MAX_TASKS = 5
 
 # Check if we're in testing mode
 TESTING = os.getenv("TESTING", "false").lower() == "true"
@@ -27,7 +33,7 @@ class VectorDB:
             # Create mock implementations for testing
             self.client = MagicMock()
             self.embedding_model = MagicMock()
-            self.embedding_model.get_sentence_embedding_dimension.return_value = 384
+            self.embedding_model.dimension = 384
             self.client.get_collection.side_effect = Exception("Collection not found")
             print(f"VectorDB initialized in testing mode")
             return
@@ -35,11 +41,11 @@ class VectorDB:
         # Initialize the Qdrant client
         self.client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
 
-        # Load the sentence transformer model from HuggingFace
-        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        # Load the embedding engine selected by EMBEDDING_ENGINE (PyTorch or ONNX)
+        self.embedding_model = get_embedder()
 
         # Get the dimension size of the model's embeddings
-        embedding_size = self.embedding_model.get_sentence_embedding_dimension()
+        embedding_size = self.embedding_model.dimension
 
         # Check if the collection already exists
         try:
@@ -62,7 +68,7 @@ class VectorDB:
         if TESTING:
             # Return a mock embedding for testing
             return np.random.rand(384)
-        return self.embedding_model.encode(text, convert_to_tensor=False)
+        return self.embedding_model.encode([text])[0]
 
     def count_todos(self) -> models.CountResult:
         """
@@ -123,6 +129,46 @@ class VectorDB:
         # The result is a list of ScoredPoint objects
         return search_result
 
+    def suggest_related(self, tasks: list, limit: int = 5) -> list:
+        """
+        Local fallback for AI suggestions: returns the texts of stored to-do
+        items that are nearest neighbours of the given tasks, excluding the
+        tasks themselves, best match first.
+        """
+        if TESTING:
+            return []
+
+        # Bound the work: the most recent tasks, embedded and searched in one batch
+        recent_tasks = tasks[-FALLBACK_MAX_TASKS:]
+        if not recent_tasks:
+            return []
+        vectors = self.embedding_model.encode(recent_tasks)
+
+        responses = self.client.query_batch_points(
+            collection_name=COLLECTION_NAME,
+            requests=[
+                models.QueryRequest(
+                    query=vector.tolist(),
+                    limit=limit + len(recent_tasks),
+                    score_threshold=MIN_SCORE_THRESHOLD,
+                    with_payload=True,
+                )
+                for vector in vectors
+            ],
+        )
+
+        existing = {normalize_text(task) for task in tasks}
+        best_scores = {}
+        for response in responses:
+            for point in response.points:
+                text = point.payload.get('text', '')
+                if not text or normalize_text(text) in existing:
+                    continue
+                best_scores[text] = max(point.score, best_scores.get(text, 0.0))
+
+        ranked = sorted(best_scores, key=best_scores.get, reverse=True)
+        return ranked[:limit]
+
     def delete_todo_vector(self, todo_id: int):
         """
         Deletes a vector from the Qdrant collection by its ID.